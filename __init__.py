@@ -1,12 +1,13 @@
 """Support to set a timetable (on and off times during the day)."""
 from __future__ import annotations
 
+import bisect
 import datetime
 import logging
+import operator
 
 import voluptuous as vol
 
-import homeassistant
 from homeassistant.const import (
     ATTR_EDITABLE,
     ATTR_STATE,
@@ -21,6 +22,7 @@ from homeassistant.helpers import collection, event as event_helper
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity_component import EntityComponent
 from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.service import async_register_admin_service
 from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType, ServiceCallType
 import homeassistant.util.dt as dt_util
@@ -37,12 +39,12 @@ SERVICE_UNSET = "unset"
 SERVICE_RESET = "reset"
 SERVICE_RECONFIG = "reconfig"
 
-MIDNIGHT = datetime.time()
-
 
 class StateEvent:
     """State event properties (time, and state value)."""
 
+    __slots__ = ("time", "state")
+
     def __init__(self, time: datetime.time, state: str) -> None:
         """Initialize the object."""
         self.time = time
@@ -54,6 +56,11 @@ def remove_micros_and_tz(time: datetime.time) -> datetime.time:
     return time.replace(microsecond=0, tzinfo=None)
 
 
+def seconds_since_midnight(time: datetime.time) -> int:
+    """Return the number of whole seconds from midnight to the time."""
+    return time.hour * 3600 + time.minute * 60 + time.second
+
+
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: cv.schema_with_slug_keys(
@@ -85,9 +92,26 @@ SERVICE_RESET_SCHEMA = vol.Schema(
     {},
     extra=vol.ALLOW_EXTRA,
 )
+
+
+def validate_timetable(value: list) -> list[tuple[datetime.time, str]]:
+    """Validate a timetable and return its (time, state) pairs sorted by time."""
+    pairs = []
+    seen = set()
+    for event in value:
+        event = SERVICE_SET_SCHEMA(event)
+        time = event[ATTR_TIME]
+        if time in seen:
+            raise vol.Invalid("The same time is not allowed more than once")
+        seen.add(time)
+        pairs.append((time, event[ATTR_STATE]))
+    pairs.sort(key=operator.itemgetter(0))
+    return pairs
+
+
 SERVICE_RECONFIG_SCHEMA = vol.Schema(
     {
-        vol.Required(ATTR_TIMETABLE): vol.All(cv.ensure_list, [SERVICE_SET_SCHEMA]),
+        vol.Required(ATTR_TIMETABLE): vol.All(cv.ensure_list, validate_timetable),
     },
     extra=vol.ALLOW_EXTRA,
 )
@@ -159,7 +183,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
             ]
         )
 
-    homeassistant.helpers.service.async_register_admin_service(
+    async_register_admin_service(
         hass,
         DOMAIN,
         SERVICE_RELOAD,
@@ -198,6 +222,9 @@ class InputTimeTable(RestoreEntity):
         """Initialize an input timetable."""
         self._config: dict = config
         self._timetable: list[StateEvent] = []
+        self._seconds: list[int] = []
+        self._attr_cache: list | None = None
+        self._last_emitted: tuple[str, list] | None = None
         self.editable = True
         self._event_unsub: CALLBACK_TYPE | None = None
 
@@ -224,13 +251,13 @@ class InputTimeTable(RestoreEntity):
         """Return the state based on the timetable events."""
         if not self._timetable:
             return STATE_OFF
-        now = dt_util.now().time()
-        prev = StateEvent(MIDNIGHT, self._timetable[-1].state)
-        for event in self._timetable:
-            if prev.time <= now < event.time:
-                break
-            prev = event
-        return prev.state
+        # If there is one entry, the state never changes.
+        if len(self._timetable) == 1:
+            return self._timetable[0].state
+        now = seconds_since_midnight(dt_util.now().time())
+        # Before the first event of the day the last event (of yesterday) is
+        # still active, which is what index -1 yields.
+        return self._timetable[bisect.bisect_right(self._seconds, now) - 1].state
 
     @property
     def state_attributes(self) -> dict:
@@ -253,64 +280,100 @@ class InputTimeTable(RestoreEntity):
             self._timetable_from_attribute(state.attributes[ATTR_TIMETABLE])
         self._update_state()
 
+    async def async_will_remove_from_hass(self) -> None:
+        """Run when entity will be removed from hass."""
+        await super().async_will_remove_from_hass()
+        if self._event_unsub:
+            self._event_unsub()
+            self._event_unsub = None
+
     def _timetable_to_attribute(self) -> list:
-        return [
-            {ATTR_TIME: event.time.isoformat(), ATTR_STATE: event.state}
-            for event in self._timetable
-        ]
+        # The cached list is shared with the written states, so it's replaced
+        # (never modified) when the timetable changes.
+        if self._attr_cache is None:
+            self._attr_cache = [
+                {ATTR_TIME: event.time.isoformat(), ATTR_STATE: event.state}
+                for event in self._timetable
+            ]
+        return self._attr_cache
 
     def _timetable_from_attribute(self, timetable: list) -> None:
-        self._timetable = [
-            StateEvent(
-                datetime.time.fromisoformat(event[ATTR_TIME]),
-                event[ATTR_STATE],
-            )
-            for event in timetable
-        ]
-        self._sort_timetable()
+        self._attr_cache = None
+        pairs = sorted(
+            (
+                (datetime.time.fromisoformat(event[ATTR_TIME]), event[ATTR_STATE])
+                for event in timetable
+            ),
+            key=operator.itemgetter(0),
+        )
+        self._timetable = [StateEvent(time, state) for time, state in pairs]
+        self._seconds = [seconds_since_midnight(time) for time, _ in pairs]
 
-    def _sort_timetable(self) -> None:
-        self._timetable.sort(key=lambda event: event.time)
+    def _find(self, time: datetime.time) -> tuple[int, bool]:
+        """Return the event's index (or insertion point) and if it exists."""
+        seconds = seconds_since_midnight(time)
+        index = bisect.bisect_left(self._seconds, seconds)
+        return index, index < len(self._seconds) and self._seconds[index] == seconds
 
     async def async_set(self, time: datetime.time, state: str) -> None:
         """Add a state change event to the timetable."""
-        for event in self._timetable:
-            if event.time == time:
-                event.state = state
-                break
+        index, found = self._find(time)
+        if found:
+            event = self._timetable[index]
+            if event.state == state:
+                # Nothing changed: no need to reschedule or write the state.
+                return
+            event.state = state
+            replaced = 1
         else:
-            self._timetable.append(StateEvent(time, state))
-            self._sort_timetable()
+            # Keep both lists sorted without re-sorting the whole timetable.
+            self._seconds.insert(index, seconds_since_midnight(time))
+            self._timetable.insert(index, StateEvent(time, state))
+            replaced = 0
+        if self._attr_cache is not None:
+            # Build a new list (see _timetable_to_attribute) reusing the
+            # other serialized events.
+            self._attr_cache = [
+                *self._attr_cache[:index],
+                {ATTR_TIME: time.isoformat(), ATTR_STATE: state},
+                *self._attr_cache[index + replaced :],
+            ]
         self._update_state()
 
     async def async_unset(self, time: datetime.time) -> None:
         """Remove a state change event."""
-        for event in self._timetable:
-            if event.time == time:
-                self._timetable.remove(event)
-                break
-        else:
+        index, found = self._find(time)
+        if not found:
             raise vol.Invalid(f"The time {time.isoformat()} doesn't exist")
+        del self._timetable[index]
+        del self._seconds[index]
+        if self._attr_cache is not None:
+            self._attr_cache = (
+                self._attr_cache[:index] + self._attr_cache[index + 1 :]
+            )
         self._update_state()
 
     async def async_reset(self) -> None:
         """Remove all state changes."""
         self._timetable.clear()
+        self._seconds.clear()
+        self._attr_cache = None
         self._update_state()
 
-    async def async_reconfig(self, timetable: list) -> None:
-        """Override the timetable with the new list."""
-        if len(timetable) > len({event[ATTR_TIME] for event in timetable}):
-            raise vol.Invalid("The same time is not allowed more than once")
-        self._timetable = [
-            StateEvent(event[ATTR_TIME], event[ATTR_STATE]) for event in timetable
-        ]
-        self._sort_timetable()
+    async def async_reconfig(self, timetable: list[tuple[datetime.time, str]]) -> None:
+        """Override the timetable with the new (validated and sorted) list."""
+        # The validated list is shared by all targeted entities, while the
+        # events are modified in place, so each entity builds its own events.
+        self._timetable = [StateEvent(time, state) for time, state in timetable]
+        self._seconds = [seconds_since_midnight(time) for time, _ in timetable]
+        self._attr_cache = None
         self._update_state()
 
     async def async_update_config(self, config: dict) -> None:
         """Handle when the config is updated."""
         self._config = config
+        # The name isn't part of the tracked state, so force the next write.
+        self._last_emitted = None
         self._update_state()
 
     def _schedule_update(self) -> None:
@@ -324,32 +387,40 @@ class InputTimeTable(RestoreEntity):
             return
 
         now = dt_util.now()
-        time = now.time()
         today = now.date()
-        prev = MIDNIGHT
 
         # Find the earliest entry which is after "now".
-        for event in self._timetable:
-            if prev <= time < event.time:
-                next_change = datetime.datetime.combine(
-                    today,
-                    event.time,
-                )
-                break
-            prev = event.time
+        index = bisect.bisect_right(self._seconds, seconds_since_midnight(now.time()))
+        if index < len(self._seconds):
+            next_change = datetime.datetime.combine(
+                today,
+                self._timetable[index].time,
+                now.tzinfo,
+            )
         else:
             # All entries have passed (today). Use 1st tomorrow's entry.
             next_change = datetime.datetime.combine(
                 today + datetime.timedelta(days=1),
                 self._timetable[0].time,
+                now.tzinfo,
             )
 
-        self._event_unsub = event_helper.async_track_point_in_time(
-            self.hass, self._update_state, next_change
+        self._event_unsub = event_helper.async_track_point_in_utc_time(
+            self.hass, self._update_state, dt_util.as_utc(next_change)
         )
 
     @callback
     def _update_state(self, *_):
         """Update the state to reflect the current time."""
         self._schedule_update()
+        # The attribute list is replaced whenever the timetable changes, so
+        # identity is enough to detect that it's unchanged.
+        emitted = (self.state, self._timetable_to_attribute())
+        if (
+            self._last_emitted
+            and emitted[0] == self._last_emitted[0]
+            and emitted[1] is self._last_emitted[1]
+        ):
+            return
+        self._last_emitted = emitted
         self.async_write_ha_state()